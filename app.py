@@ -1,66 +1,61 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+# When run directly, make blocking socket I/O (the OpenAI calls) cooperative before anything else is imported
+if __name__ == '__main__':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 import os
 import openai
-import json
-from dotenv import load_dotenv
+from openai import OpenAI
+import orjson
 import re
+import httpx
+import tiktoken
+from dotenv import load_dotenv
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from celery import Celery
+from gevent.lock import BoundedSemaphore
+from gevent.pool import Group
+from enum import Enum
+from functools import lru_cache
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-# Enable CORS for all routes with additional options
-CORS(app, resources={r"/*": {"origins": "*", "allow_headers": ["Content-Type"]}})
+class OrjsonProvider(JSONProvider):
+    """Serialize responses with orjson (compact, unsorted keys)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
 
 # Set OpenAI API key from environment variables
 openai_api_key = os.getenv('OPENAI_API_KEY')
-if not openai_api_key:
-    print("WARNING: OPENAI_API_KEY not found in environment variables. API calls will fail.")
-else:
-    openai.api_key = openai_api_key
 
-@app.route('/', methods=['GET'])
-def home():
-    """Basic health check endpoint"""
-    return jsonify({
-        "status": "online",
-        "message": "Resume analysis API is running",
-        "api_key_configured": bool(openai_api_key)
-    })
+# One synchronous client for the process so calls reuse keep-alive connections to the API.
+# Under gevent workers the blocking calls yield while waiting on the socket. The app must be
+# imported after gevent monkey-patches, so gunicorn --preload is not supported.
+CLIENT = OpenAI(
+    api_key=openai_api_key,
+    http_client=httpx.Client(limits=httpx.Limits(max_connections=100, max_keepalive_connections=50))
+) if openai_api_key else None
 
-@app.route('/api/analyze', methods=['HEAD', 'OPTIONS'])
-def check_status():
-    # This endpoint is used to check if the backend is running
-    return '', 200
+# Pinned snapshot that supports JSON mode (response_format)
+OPENAI_MODEL = "gpt-3.5-turbo-0125"
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_resume():
-    try:
-        # Validate API key is available
-        if not openai_api_key:
-            return jsonify({
-                'error': 'OpenAI API key not found. Please check your .env file.',
-                'details': 'Add OPENAI_API_KEY=your_key_here to your .env file'
-            }), 500
-            
-        data = request.json
-        
-        if not data or 'resume' not in data or 'jobDescription' not in data:
-            return jsonify({'error': 'Missing resume or job description data'}), 400
-        
-        resume_data = data['resume']
-        job_description = data['jobDescription']
-        
-        # Convert resume data to a readable format for the AI
-        resume_text = format_resume_for_ai(resume_data)
-        
-        try:
-            # Call OpenAI API to analyze and generate tailored content
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": """You are a professional resume consultant specializing in tailoring resumes to specific job descriptions. Your task is to analyze the candidate's resume and the job description to create highly tailored content that maximizes the match between the candidate's qualifications and the job requirements.
+SYSTEM_PROMPT = """You are a professional resume consultant specializing in tailoring resumes to specific job descriptions. Your task is to analyze the candidate's resume and the job description to create highly tailored content that maximizes the match between the candidate's qualifications and the job requirements.
 
 Follow these guidelines:
 1. Identify keywords and skills in the job description
@@ -72,15 +67,14 @@ Follow these guidelines:
 7. Don't fabricate experience, but optimize the wording of existing experience
 8. NEVER inflate years of experience - use ONLY the timeframes and durations that appear in the original resume
 9. Do NOT claim expertise or experience levels that aren't supported by the resume
-10. If the job requires more experience than the candidate has, focus on relevant achievements instead of claiming that experience"""},
-                    {"role": "user", "content": f"""
-Below is a resume and a job description. Create a tailored version of the resume that highlights relevant skills and experiences matching this specific job.
-
----RESUME---
-{resume_text}
+10. If the job requires more experience than the candidate has, focus on relevant achievements instead of claiming that experience"""
 
----JOB DESCRIPTION---
-{job_description}
+# Every request starts with the same static messages (system prompt, then instructions) and
+# only the last message carries the resume and job description. This prepares for OpenAI's
+# prompt-prefix caching but does not enable it yet: caching needs a prefix of at least 1024
+# tokens and these are about 700 (single) and 460 (packed). Keep them free of per-request values.
+TAILORING_GUIDELINES = """
+The next message contains a resume and a job description. Create a tailored version of the resume that highlights relevant skills and experiences matching this specific job.
 
 Please provide:
 
@@ -101,7 +95,10 @@ Please provide:
    - Make sure each bullet point is relevant to the job being applied for
    - IMPORTANT: Do NOT invent new experience or inflate existing experience - stay strictly within what is presented in the original resume
    - If the job requires skills not explicitly stated in the resume, focus on transferable skills instead of claiming direct experience
+"""
 
+# Line-based output format, used when streaming so sections can be parsed as they arrive
+USER_INSTRUCTIONS = TAILORING_GUIDELINES + """
 Format your response exactly as follows:
 
 SUMMARY:
@@ -121,22 +118,157 @@ EXPERIENCE:
 • [Tailored bullet point 4 if applicable]
 
 (continue for all work experiences in the original resume)
-"""}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            ai_content = response.choices[0].message['content']
+"""
+
+# JSON output format, used with response_format={"type": "json_object"}
+JSON_USER_INSTRUCTIONS = TAILORING_GUIDELINES + """
+Return a JSON object with exactly these keys:
+- "summary": the tailored summary as a single paragraph string
+- "workExperience": an array with one entry per work experience in the original resume, each an object {"company": string, "bulletPoints": [string, ...]}
+"""
+
+# Per-request message, filled in with str.format
+USER_PROMPT_TEMPLATE = """---RESUME---
+{resume}
+
+---JOB DESCRIPTION---
+{jd}"""
+
+PACKED_USER_INSTRUCTIONS = """
+The next message contains several resumes, each paired with a job description and introduced by a ---ITEM n--- marker. Tailor every item independently.
+
+For each item provide:
+1. A concise, powerful professional summary (3-4 sentences) that positions the candidate for that job, using ACTUAL years of experience only
+2. For each company in that item's resume, 3-4 tailored bullet points that start with strong action verbs, use keywords from the job description and quantify achievements where the resume supports it
+
+Do NOT invent new experience or inflate existing experience.
+
+Respond with ONLY a JSON array containing one object per item, in item order:
+[{"index": 0, "summary": "...", "experience": [{"company": "...", "bulletPoints": ["...", "..."]}]}]
+"""
+
+# Token caps on the prompt inputs so oversized payloads cannot blow up cost and latency.
+# Truncation keeps the start of the resume text: the profile and the first (most recent) jobs.
+MAX_RESUME_TOKENS = 6000
+MAX_JOB_DESCRIPTION_TOKENS = 2000
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """Tokenizer for the model, loaded on first use since tiktoken downloads it on a cold cache"""
+    return tiktoken.encoding_for_model("gpt-3.5-turbo")
+
+# Translation table removing the * and " characters the model sprinkles into its output
+_STRIP = str.maketrans('', '', '*"')
+
+# Limits for the bulk endpoint. The concurrency and rate limits throttle only the bulk fan-out
+# (the other endpoints make a single OpenAI call per request) and are kept per worker process,
+# so they cap bursts from bulk calls rather than keeping the whole account under its limits.
+# The defaults let a 50-item bulk call of typical resumes start at once; lower them for small tiers.
+MAX_BULK_ITEMS = 50
+# Bulk items packed into a single chat completion, bounded by an estimated prompt size
+BULK_PACK_SIZE = 4
+BULK_PACK_PROMPT_TOKENS = 8000
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('OPENAI_MAX_CONCURRENT_REQUESTS', 10))
+MAX_REQUESTS_PER_MINUTE = int(os.environ.get('OPENAI_MAX_REQUESTS_PER_MINUTE', 3500))
+MAX_TOKENS_PER_MINUTE = int(os.environ.get('OPENAI_MAX_TOKENS_PER_MINUTE', 90000))
+
+api = Blueprint('api', __name__)
+
+# Redis-backed task queue for analyses run outside the web workers:
+#   celery -A app.celery worker
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+celery = Celery('tasks', broker=REDIS_URL, backend=REDIS_URL)
+
+# In-process LRU cache of tailored content, keyed by the (resume, job description) pair
+CACHE_MAXSIZE = 512
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def make_cache_key(resume_data, job_description):
+    """Content-addressed key for a resume / job description pair"""
+    payload = orjson.dumps(resume_data, option=orjson.OPT_SORT_KEYS) + b'|' + str(job_description).encode()
+    return hashlib.blake2b(payload).digest()
+
+def cache_get(key):
+    with _analysis_cache_lock:
+        value = _analysis_cache.get(key)
+        if value is not None:
+            _analysis_cache.move_to_end(key)
+        return value
+
+def cache_put(key, value):
+    # Never cache an empty parse; it would be served (and 304'd) until evicted
+    if not value.summary and not value.workExperience:
+        return
+    with _analysis_cache_lock:
+        _analysis_cache[key] = value
+        _analysis_cache.move_to_end(key)
+        if len(_analysis_cache) > CACHE_MAXSIZE:
+            _analysis_cache.popitem(last=False)
+
+@api.route('/', methods=['GET'])
+def home():
+    """Basic health check endpoint"""
+    return jsonify({
+        "status": "online",
+        "message": "Resume analysis API is running",
+        "api_key_configured": True  # create_app() refuses to start without a key
+    })
+
+@api.route('/api/analyze', methods=['HEAD', 'OPTIONS'])
+def check_status():
+    # This endpoint is used to check if the backend is running
+    return '', 200
+
+@api.route('/api/analyze', methods=['POST'])
+def analyze_resume():
+    try:
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body is not valid JSON'}), 400
+        
+        if not data or 'resume' not in data or 'jobDescription' not in data:
+            return jsonify({'error': 'Missing resume or job description data'}), 400
+        
+        resume_data = data['resume']
+        job_description = data['jobDescription']
+        
+        # Serve repeat requests from the cache without calling OpenAI. The cache key doubles
+        # as a strong ETag, so clients that already hold the content get an empty 304.
+        cache_key = make_cache_key(resume_data, job_description)
+        etag = cache_key.hex()
+        cached_content = cache_get(cache_key)
+        if cached_content is not None:
+            if etag in request.if_none_match:
+                response = current_app.response_class(status=304)
+            else:
+                response = jsonify({
+                    'success': True,
+                    'tailoredContent': cached_content
+                })
+            response.set_etag(etag)
+            return response
+        
+        # Convert resume data to a readable format for the AI
+        resume_text = format_resume_for_ai(resume_data)
+        
+        try:
+            # Call OpenAI API to analyze and generate tailored content
+            response = CLIENT.chat.completions.create(**build_chat_request(resume_text, job_description))
+            choice = response.choices[0]
             
             # Parse AI response to extract summary and work experience
-            tailored_content = parse_ai_response(ai_content)
+            tailored_content = validate_tailored_content(parse_ai_response(choice.message.content), choice.finish_reason)
+            cache_put(cache_key, tailored_content)
             
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'tailoredContent': tailored_content
             })
-        except openai.error.OpenAIError as oe:
+            response.set_etag(etag)
+            return response
+        except openai.OpenAIError as oe:
             print(f"OpenAI API Error: {str(oe)}")
             return jsonify({
                 'error': f'OpenAI API error: {str(oe)}',
@@ -152,134 +284,762 @@ EXPERIENCE:
             'tailoredContent': None
         }), 500
 
+def format_sse(event, payload):
+    """Encode one server-sent event frame"""
+    return b'event: ' + event.encode() + b'\ndata: ' + orjson.dumps(payload) + b'\n\n'
+
+@api.route('/api/analyze/stream', methods=['POST'])
+def analyze_resume_stream():
+    """Stream the tailored content as server-sent events, one section at a time"""
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return jsonify({'error': 'Request body is not valid JSON'}), 400
+    
+    if not data or 'resume' not in data or 'jobDescription' not in data:
+        return jsonify({'error': 'Missing resume or job description data'}), 400
+    
+    resume_data = data['resume']
+    job_description = data['jobDescription']
+    cache_key = make_cache_key(resume_data, job_description)
+    
+    def generate():
+        cached_content = cache_get(cache_key)
+        if cached_content is not None:
+            yield format_sse('summary', {'summary': cached_content.summary})
+            for exp in cached_content.workExperience:
+                yield format_sse('experience', exp)
+            yield format_sse('done', {'success': True, 'tailoredContent': cached_content})
+            return
+        
+        try:
+            chat_request = build_chat_request(format_resume_for_ai(resume_data), job_description, json_output=False)
+            response = CLIENT.chat.completions.create(**chat_request, stream=True)
+            
+            # Feed complete lines to the parser as tokens arrive and forward each finished section
+            parser = ResponseParser()
+            pending = ''
+            finish_reason = None
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if not chunk.choices[0].delta.content:
+                    continue
+                pending += chunk.choices[0].delta.content
+                *lines, pending = pending.split('\n')
+                for line in lines:
+                    for event, payload in parser.feed(line):
+                        yield format_sse(event, payload)
+            
+            for event, payload in parser.feed(pending) + parser.close():
+                yield format_sse(event, payload)
+            
+            tailored_content = validate_tailored_content(parser.result(), finish_reason)
+            cache_put(cache_key, tailored_content)
+            yield format_sse('done', {'success': True, 'tailoredContent': tailored_content})
+        except openai.OpenAIError as oe:
+            print(f"OpenAI API Error: {str(oe)}")
+            yield format_sse('error', {'error': f'OpenAI API error: {str(oe)}', 'success': False})
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            yield format_sse('error', {'error': str(e), 'success': False})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@celery.task(name='run_analysis')
+def run_analysis(resume_data, job_description):
+    """Tailor a resume on a queue worker and return the content as plain JSON data"""
+    cache_key = make_cache_key(resume_data, job_description)
+    tailored_content = cache_get(cache_key)
+    if tailored_content is None:
+        response = CLIENT.chat.completions.create(**build_chat_request(format_resume_for_ai(resume_data), job_description))
+        choice = response.choices[0]
+        tailored_content = validate_tailored_content(parse_ai_response(choice.message.content), choice.finish_reason)
+        cache_put(cache_key, tailored_content)
+    return asdict(tailored_content)
+
+@api.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    """Queue an analysis on the task workers and return the job id to poll"""
+    try:
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body is not valid JSON'}), 400
+        
+        if not data or 'resume' not in data or 'jobDescription' not in data:
+            return jsonify({'error': 'Missing resume or job description data'}), 400
+        
+        task = run_analysis.delay(data['resume'], data['jobDescription'])
+        
+        return jsonify({
+            'success': True,
+            'jobId': task.id
+        }), 202
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 500
+
+@api.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Report the state of a queued analysis and return the tailored content once it succeeds"""
+    try:
+        task = celery.AsyncResult(job_id)
+        
+        if task.state == 'FAILURE':
+            return jsonify({
+                'error': str(task.result),
+                'success': False,
+                'status': task.state,
+                'tailoredContent': None
+            }), 500
+        
+        return jsonify({
+            'success': True,
+            'status': task.state,
+            'tailoredContent': task.result if task.state == 'SUCCESS' else None
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'success': False,
+            'tailoredContent': None
+        }), 500
+
+@api.route('/api/analyze/batch', methods=['POST'])
+def submit_batch_analysis():
+    """Queue an analysis on the OpenAI Batch API and return the batch id to poll"""
+    try:
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body is not valid JSON'}), 400
+        
+        if not data or 'resume' not in data or 'jobDescription' not in data:
+            return jsonify({'error': 'Missing resume or job description data'}), 400
+        
+        resume_data = data['resume']
+        job_description = data['jobDescription']
+        resume_text = format_resume_for_ai(resume_data)
+        
+        # The custom id and batch metadata carry the cache key so finished results are cached
+        # on the first poll and served from the cache on later ones
+        cache_key = make_cache_key(resume_data, job_description).hex()
+        batch_line = {
+            'custom_id': cache_key,
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': build_chat_request(resume_text, job_description)
+        }
+        
+        try:
+            batch_file = CLIENT.files.create(
+                file=('analyze.jsonl', orjson.dumps(batch_line) + b'\n'),
+                purpose='batch'
+            )
+            batch = CLIENT.batches.create(
+                input_file_id=batch_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h',
+                metadata={'cache_key': cache_key}
+            )
+            
+            return jsonify({
+                'success': True,
+                'batchId': batch.id
+            }), 202
+        except openai.OpenAIError as oe:
+            print(f"OpenAI API Error: {str(oe)}")
+            return jsonify({
+                'error': f'OpenAI API error: {str(oe)}',
+                'success': False
+            }), 500
+            
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 500
+
+@api.route('/api/analyze/batch/<batch_id>', methods=['GET'])
+def get_batch_analysis(batch_id):
+    """Report the state of a batch analysis and return the tailored content once completed"""
+    try:
+        batch = CLIENT.batches.retrieve(batch_id)
+        
+        if batch.status != 'completed':
+            failed = batch.status in ('failed', 'expired', 'cancelling', 'cancelled')
+            return jsonify({
+                'success': not failed,
+                'status': batch.status,
+                'tailoredContent': None
+            }), 500 if failed else 200
+        
+        cache_key = (batch.metadata or {}).get('cache_key')
+        cached_content = cache_get(bytes.fromhex(cache_key)) if cache_key else None
+        if cached_content is not None:
+            return jsonify({
+                'success': True,
+                'status': batch.status,
+                'tailoredContent': cached_content
+            })
+        
+        # Lines that failed are written to the error file instead of the output file
+        result_file_id = batch.output_file_id or batch.error_file_id
+        if not result_file_id:
+            return jsonify({
+                'error': 'Batch completed without any results',
+                'success': False,
+                'status': batch.status,
+                'tailoredContent': None
+            }), 500
+        
+        tailored_content = None
+        error = 'Batch completed without any successful results'
+        for line in CLIENT.files.content(result_file_id).content.splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            response = record.get('response') or {}
+            if record.get('error') or response.get('status_code') != 200:
+                line_error = record.get('error') or (response.get('body') or {}).get('error') or {}
+                error = line_error.get('message') or f"Batch request failed with status {response.get('status_code')}"
+                continue
+            choice = response['body']['choices'][0]
+            try:
+                tailored_content = validate_tailored_content(
+                    parse_ai_response(choice['message']['content']), choice.get('finish_reason')
+                )
+            except ValueError as e:
+                error = str(e)
+                continue
+            cache_put(bytes.fromhex(record['custom_id']), tailored_content)
+        
+        if tailored_content is None:
+            return jsonify({
+                'error': error,
+                'success': False,
+                'status': batch.status,
+                'tailoredContent': None
+            }), 500
+        return jsonify({
+            'success': True,
+            'status': batch.status,
+            'tailoredContent': tailored_content
+        })
+    except openai.OpenAIError as oe:
+        print(f"OpenAI API Error: {str(oe)}")
+        return jsonify({
+            'error': f'OpenAI API error: {str(oe)}',
+            'success': False,
+            'tailoredContent': None
+        }), 500
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'success': False,
+            'tailoredContent': None
+        }), 500
+
+class RateLimiter:
+    """Token bucket throttling both requests and tokens per minute"""
+
+    def __init__(self, max_requests_per_minute, max_tokens_per_minute):
+        self.max_requests = max_requests_per_minute
+        self.max_tokens = max_tokens_per_minute
+        self.available_requests = max_requests_per_minute
+        self.available_tokens = max_tokens_per_minute
+        self.last_update = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.last_update = now
+        self.available_requests = min(self.max_requests, self.available_requests + self.max_requests * elapsed / 60)
+        self.available_tokens = min(self.max_tokens, self.available_tokens + self.max_tokens * elapsed / 60)
+
+    def acquire(self, tokens):
+        """Block until one request and the given number of tokens are available"""
+        tokens = min(tokens, self.max_tokens)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self.available_requests) * 60 / self.max_requests,
+                    (tokens - self.available_tokens) * 60 / self.max_tokens
+                )
+            # Sleep outside the lock; under gevent this yields to other greenlets
+            time.sleep(wait)
+
+# Shared by every bulk request in the process so concurrent bulk calls draw from one budget.
+# A gevent semaphore, so a full bulk call blocks only the waiting greenlet, never the worker.
+BULK_SLOTS = BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+BULK_RATE_LIMITER = RateLimiter(MAX_REQUESTS_PER_MINUTE, MAX_TOKENS_PER_MINUTE)
+
+def estimate_request_tokens(chat_request):
+    """Rough token count of a chat request (~4 characters per token plus the completion budget)"""
+    prompt_chars = sum(len(message['content']) for message in chat_request['messages'])
+    return prompt_chars // 4 + chat_request['max_tokens']
+
+def is_bulk_item(item):
+    """Whether a bulk item has the resume object and job description needed to analyze it"""
+    return isinstance(item, dict) and isinstance(item.get('resume'), dict) and 'jobDescription' in item
+
+def analyze_item(item):
+    """Tailor a single bulk item, honouring the concurrency and rate limits
+
+    Failures are reported in the item's result so they never discard the rest of the bulk call.
+    """
+    if not is_bulk_item(item):
+        return {'success': False, 'error': 'Missing resume or job description data', 'tailoredContent': None}
+    
+    try:
+        cache_key = make_cache_key(item['resume'], item['jobDescription'])
+        cached_content = cache_get(cache_key)
+        if cached_content is not None:
+            return {'success': True, 'tailoredContent': cached_content}
+        
+        chat_request = build_chat_request(format_resume_for_ai(item['resume']), item['jobDescription'])
+        with BULK_SLOTS:
+            BULK_RATE_LIMITER.acquire(estimate_request_tokens(chat_request))
+            response = CLIENT.chat.completions.create(**chat_request)
+        
+        choice = response.choices[0]
+        tailored_content = validate_tailored_content(parse_ai_response(choice.message.content), choice.finish_reason)
+        cache_put(cache_key, tailored_content)
+        return {'success': True, 'tailoredContent': tailored_content}
+    except openai.OpenAIError as oe:
+        print(f"OpenAI API Error: {str(oe)}")
+        return {'success': False, 'error': f'OpenAI API error: {str(oe)}', 'tailoredContent': None}
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return {'success': False, 'error': str(e), 'tailoredContent': None}
+
+def pack_items(items):
+    """Group (index, item) pairs into chunks small enough to share one chat completion"""
+    chunks = []
+    chunk = []
+    chunk_tokens = 0
+    for index, item in items:
+        # The JSON size over-estimates the formatted prompt and cannot fail on malformed resumes
+        item_tokens = len(orjson.dumps(item)) // 4
+        if chunk and (len(chunk) >= BULK_PACK_SIZE or chunk_tokens + item_tokens > BULK_PACK_PROMPT_TOKENS):
+            chunks.append(chunk)
+            chunk = []
+            chunk_tokens = 0
+        chunk.append((index, item))
+        chunk_tokens += item_tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def build_packed_chat_request(items):
+    """Build one chat completion request covering several resume / job description pairs"""
+    sections = []
+    for index, item in enumerate(items):
+        sections.append(f"---ITEM {index}---")
+        sections.append("---RESUME---")
+        sections.append(truncate_tokens(format_resume_for_ai(item['resume']), MAX_RESUME_TOKENS))
+        sections.append("---JOB DESCRIPTION---")
+        sections.append(truncate_tokens(item['jobDescription'], MAX_JOB_DESCRIPTION_TOKENS))
+        sections.append("")
+    items_text = "\n".join(sections)
+    
+    return {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": PACKED_USER_INSTRUCTIONS},
+            {"role": "user", "content": items_text}
+        ],
+        "temperature": 0.7,
+        "max_tokens": min(4000, 1000 * len(items))
+    }
+
+def clean_tailored_content(summary, experiences):
+    """Normalize a summary and experience list decoded from JSON model output"""
+    work_experience = []
+    for exp in experiences if isinstance(experiences, list) else []:
+        if not isinstance(exp, dict):
+            continue
+        bullet_points = exp.get('bulletPoints')
+        if not isinstance(bullet_points, list):
+            continue
+        bullet_points = [str(bp).translate(_STRIP).strip() for bp in bullet_points]
+        bullet_points = [bp for bp in bullet_points if bp]
+        if exp.get('company') and bullet_points:
+            # Limit to 4 bullet points
+            work_experience.append(WorkExperience(str(exp['company']).strip(), bullet_points[:4]))
+    
+    return TailoredContent(' '.join(str(summary or '').split()).translate(_STRIP), work_experience)
+
+def parse_packed_response(ai_response, finish_reason, item_count):
+    """Parse the JSON array returned for a packed request into tailored content per item"""
+    entries = orjson.loads(ai_response)
+    if not isinstance(entries, list) or len(entries) != item_count:
+        raise ValueError(f"Expected {item_count} packed results")
+    
+    results = [None] * item_count
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError("Packed result is not an object")
+        index = entry.get('index', position)
+        if not isinstance(index, int) or not 0 <= index < item_count or results[index] is not None:
+            raise ValueError(f"Invalid packed result index {index!r}")
+        
+        results[index] = validate_tailored_content(
+            clean_tailored_content(entry.get('summary'), entry.get('experience')), finish_reason
+        )
+    return results
+
+def bulk_analyze(items):
+    """Tailor several bulk items with one packed chat completion, falling back to one call per item"""
+    if len(items) > 1:
+        try:
+            chat_request = build_packed_chat_request(items)
+            with BULK_SLOTS:
+                BULK_RATE_LIMITER.acquire(estimate_request_tokens(chat_request))
+                response = CLIENT.chat.completions.create(**chat_request)
+            choice = response.choices[0]
+            packed_contents = parse_packed_response(choice.message.content, choice.finish_reason, len(items))
+        except Exception as e:
+            # Retry item by item so only the items that actually fail report an error
+            print(f"Packed analysis failed, falling back to single requests: {str(e)}")
+        else:
+            for item, tailored_content in zip(items, packed_contents):
+                cache_put(make_cache_key(item['resume'], item['jobDescription']), tailored_content)
+            return [{'success': True, 'tailoredContent': tailored_content} for tailored_content in packed_contents]
+    
+    return Group().map(analyze_item, items)
+
+def analyze_items(items):
+    """Tailor all bulk items concurrently, returning results in input order"""
+    results = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        if not is_bulk_item(item):
+            results[index] = {'success': False, 'error': 'Missing resume or job description data', 'tailoredContent': None}
+            continue
+        cached_content = cache_get(make_cache_key(item['resume'], item['jobDescription']))
+        if cached_content is not None:
+            results[index] = {'success': True, 'tailoredContent': cached_content}
+        else:
+            pending.append((index, item))
+    
+    chunks = pack_items(pending)
+    # Fan the chunks out over greenlets; under gevent workers the blocking OpenAI calls overlap
+    chunk_results = Group().map(
+        lambda chunk: bulk_analyze([item for _, item in chunk]), chunks
+    )
+    
+    for chunk, chunk_result in zip(chunks, chunk_results):
+        for (index, _), result in zip(chunk, chunk_result):
+            results[index] = result
+    return results
+
+@api.route('/api/analyze/bulk', methods=['POST'])
+def analyze_resumes_bulk():
+    """Tailor several resume / job description pairs in one call"""
+    try:
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return jsonify({'error': 'Request body is not valid JSON'}), 400
+        items = data.get('items') if isinstance(data, dict) else None
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Missing items to analyze'}), 400
+        if len(items) > MAX_BULK_ITEMS:
+            return jsonify({'error': f'Too many items, at most {MAX_BULK_ITEMS} are allowed'}), 400
+        
+        results = analyze_items(items)
+        
+        return jsonify({
+            'success': all(result['success'] for result in results),
+            'results': results
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'success': False,
+            'results': None
+        }), 500
+
+def truncate_tokens(text, max_tokens):
+    """Cut text down to at most max_tokens tokens"""
+    text = str(text)
+    # Every token covers at least one character, so short texts need no encoding
+    if len(text) <= max_tokens:
+        return text
+    encoding = get_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def build_chat_request(resume_text, job_description, json_output=True):
+    """Build the chat completion parameters for tailoring a resume to a job description
+
+    With json_output the model is held to a JSON object via response_format; otherwise it
+    answers in the SUMMARY: / EXPERIENCE: text format.
+    """
+    chat_request = {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": JSON_USER_INSTRUCTIONS if json_output else USER_INSTRUCTIONS},
+            {"role": "user", "content": USER_PROMPT_TEMPLATE.format(
+                resume=truncate_tokens(resume_text, MAX_RESUME_TOKENS),
+                jd=truncate_tokens(job_description, MAX_JOB_DESCRIPTION_TOKENS)
+            )}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1500
+    }
+    if json_output:
+        chat_request["response_format"] = {"type": "json_object"}
+    return chat_request
+
+def format_descriptions(item):
+    """Format the description lines of a resume entry, if it has any"""
+    descriptions = item.get('descriptions')
+    if not descriptions:
+        return ""
+    return "Descriptions:\n" + "".join(f"- {desc}\n" for desc in descriptions)
+
 def format_resume_for_ai(resume_data):
     """Format resume data into a readable text for the AI"""
-    formatted = []
+    sections = []
     
     # Add profile information
     if 'profile' in resume_data:
         profile = resume_data['profile']
-        formatted.append("PROFILE:")
-        formatted.append(f"Name: {profile.get('name', 'N/A')}")
-        formatted.append(f"Email: {profile.get('email', 'N/A')}")
-        formatted.append(f"Phone: {profile.get('phone', 'N/A')}")
-        formatted.append(f"Location: {profile.get('location', 'N/A')}")
-        formatted.append(f"URL: {profile.get('url', 'N/A')}")
-        formatted.append(f"Summary: {profile.get('summary', 'N/A')}")
-        formatted.append("")
+        sections.append(f"""PROFILE:
+Name: {profile.get('name', 'N/A')}
+Email: {profile.get('email', 'N/A')}
+Phone: {profile.get('phone', 'N/A')}
+Location: {profile.get('location', 'N/A')}
+URL: {profile.get('url', 'N/A')}
+Summary: {profile.get('summary', 'N/A')}
+""")
     
     # Add work experience
-    if 'workExperiences' in resume_data and resume_data['workExperiences']:
-        formatted.append("WORK EXPERIENCE:")
-        for exp in resume_data['workExperiences']:
-            formatted.append(f"Company: {exp.get('company', 'N/A')}")
-            formatted.append(f"Job Title: {exp.get('jobTitle', 'N/A')}")
-            formatted.append(f"Date: {exp.get('date', 'N/A')}")
-            if 'descriptions' in exp and exp['descriptions']:
-                formatted.append("Descriptions:")
-                for desc in exp['descriptions']:
-                    formatted.append(f"- {desc}")
-            formatted.append("")
+    if resume_data.get('workExperiences'):
+        sections.append("WORK EXPERIENCE:\n" + "\n".join(
+            f"Company: {exp.get('company', 'N/A')}\n"
+            f"Job Title: {exp.get('jobTitle', 'N/A')}\n"
+            f"Date: {exp.get('date', 'N/A')}\n"
+            f"{format_descriptions(exp)}"
+            for exp in resume_data['workExperiences']
+        ))
     
     # Add education
-    if 'educations' in resume_data and resume_data['educations']:
-        formatted.append("EDUCATION:")
-        for edu in resume_data['educations']:
-            formatted.append(f"School: {edu.get('school', 'N/A')}")
-            formatted.append(f"Degree: {edu.get('degree', 'N/A')}")
-            formatted.append(f"Date: {edu.get('date', 'N/A')}")
-            if 'descriptions' in edu and edu['descriptions']:
-                formatted.append("Descriptions:")
-                for desc in edu['descriptions']:
-                    formatted.append(f"- {desc}")
-            formatted.append("")
+    if resume_data.get('educations'):
+        sections.append("EDUCATION:\n" + "\n".join(
+            f"School: {edu.get('school', 'N/A')}\n"
+            f"Degree: {edu.get('degree', 'N/A')}\n"
+            f"Date: {edu.get('date', 'N/A')}\n"
+            f"{format_descriptions(edu)}"
+            for edu in resume_data['educations']
+        ))
     
     # Add skills
     if 'skills' in resume_data:
-        formatted.append("SKILLS:")
-        if 'featuredSkills' in resume_data['skills']:
-            for skill in resume_data['skills']['featuredSkills']:
-                if skill.get('skill'):
-                    formatted.append(f"- {skill.get('skill')}")
-        
-        if 'descriptions' in resume_data['skills']:
-            for desc in resume_data['skills']['descriptions']:
-                formatted.append(f"- {desc}")
-        formatted.append("")
+        skills = resume_data['skills']
+        featured_skills = (skill.get('skill') for skill in skills.get('featuredSkills', ()))
+        sections.append("SKILLS:\n" + "".join(f"- {skill}\n" for skill in featured_skills if skill)
+                        + "".join(f"- {desc}\n" for desc in skills.get('descriptions', ())))
     
     # Add projects
-    if 'projects' in resume_data and resume_data['projects']:
-        formatted.append("PROJECTS:")
-        for proj in resume_data['projects']:
-            formatted.append(f"Project: {proj.get('project', 'N/A')}")
-            formatted.append(f"Date: {proj.get('date', 'N/A')}")
-            if 'descriptions' in proj and proj['descriptions']:
-                formatted.append("Descriptions:")
-                for desc in proj['descriptions']:
-                    formatted.append(f"- {desc}")
-            formatted.append("")
+    if resume_data.get('projects'):
+        sections.append("PROJECTS:\n" + "\n".join(
+            f"Project: {proj.get('project', 'N/A')}\n"
+            f"Date: {proj.get('date', 'N/A')}\n"
+            f"{format_descriptions(proj)}"
+            for proj in resume_data['projects']
+        ))
     
-    return "\n".join(formatted)
+    return "\n".join(sections)
 
-def parse_ai_response(ai_response):
-    """Parse the AI response to extract summary and work experience sections"""
-    # Initialize with default structure
-    result = {
-        'summary': '',
-        'workExperience': []
-    }
-    
-    # Extract summary section (everything between "SUMMARY:" and "EXPERIENCE:")
-    summary_match = re.search(r'SUMMARY:(.*?)(?=EXPERIENCE:|$)', ai_response, re.DOTALL | re.IGNORECASE)
-    if summary_match:
-        summary_text = summary_match.group(1).strip()
-        # Clean up the summary text
-        summary_text = re.sub(r'^\s*•\s*', '', summary_text)  # Remove bullet points if present
-        summary_text = re.sub(r'\s+', ' ', summary_text)  # Replace multiple spaces with single space
-        result['summary'] = summary_text
-    
-    # Extract experience section
-    experience_section = re.search(r'EXPERIENCE:(.*?)$', ai_response, re.DOTALL | re.IGNORECASE)
-    if experience_section:
-        experience_text = experience_section.group(1).strip()
+# Parsed content is built from slotted dataclasses rather than dicts. orjson serializes them
+# natively with the same camelCase keys, so API responses are unchanged.
+@dataclass
+class WorkExperience:
+    __slots__ = ('company', 'bulletPoints')
+    company: str
+    bulletPoints: list
+
+@dataclass
+class TailoredContent:
+    __slots__ = ('summary', 'workExperience')
+    summary: str
+    workExperience: list
+
+# Section headers such as "SUMMARY:", "### Professional Summary:" or "**WORK EXPERIENCE:**"
+SECTION_HEADER = re.compile(r'[#*\s]*(?:[a-z]+\s+)?(SUMMARY|EXPERIENCE)\s*:[*\s]*', re.IGNORECASE)
+
+class ParseState(Enum):
+    """Section of the AI response currently being read"""
+    PRE = 0
+    SUMMARY = 1
+    EXPERIENCE = 2
+
+class ResponseParser:
+    """Single-pass parser for the SUMMARY: / EXPERIENCE: response format, fed one line at a time
+
+    feed() and close() return the sections completed by that call as (event, payload) pairs,
+    so a streamed response can be forwarded section by section.
+    """
+
+    def __init__(self):
+        self.state = ParseState.PRE
+        self.summary_lines = []
+        self.summary = None
+        self.companies = []
+        self.company = None
+
+    def _finish_summary(self):
+        # Drop a leading bullet, collapse whitespace and remove special characters
+        if self.summary_lines and self.summary_lines[0].startswith('•'):
+            self.summary_lines[0] = self.summary_lines[0][1:]
+        self.summary = ' '.join(' '.join(self.summary_lines).split()).translate(_STRIP)
+        return ('summary', {'summary': self.summary})
+
+    def _finish_company(self):
+        company, self.company = self.company, None
+        if not company.bulletPoints:
+            return None
+        # Limit to 4 bullet points and remove special characters
+        company.bulletPoints = [bp.translate(_STRIP) for bp in company.bulletPoints[:4]]
+        self.companies.append(company)
+        return ('experience', company)
+
+    def feed(self, line):
+        """Consume one line of the response"""
+        events = []
+        indented = line[:1].isspace()
+        line = line.strip()
+        header = SECTION_HEADER.match(line)
+        if header and header.group(1).upper() == 'SUMMARY':
+            self.state = ParseState.SUMMARY
+            line = line[header.end():].strip()
+        elif header:
+            if self.state is ParseState.SUMMARY:
+                events.append(self._finish_summary())
+            self.state = ParseState.EXPERIENCE
+            line = line[header.end():].strip()
         
-        # Split by company (companies are lines that don't start with a bullet point)
-        company_sections = re.split(r'\n(?=[^\s•\-*])', experience_text)
+        if not line:
+            return events
         
-        for section in company_sections:
-            if not section.strip():
-                continue
-                
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-                
-            company_name = lines[0].strip()
-            bullet_points = []
-            
-            for line in lines[1:]:
-                line = line.strip()
-                if line.startswith('•') or line.startswith('-') or line.startswith('*'):
-                    # Extract the bullet point text
-                    point = line[1:].strip()
-                    if point:
-                        bullet_points.append(point)
-            
-            if company_name and bullet_points:
-                result['workExperience'].append({
-                    'company': company_name,
-                    'bulletPoints': bullet_points[:4]  # Limit to 4 bullet points
-                })
+        if self.state is ParseState.SUMMARY:
+            self.summary_lines.append(line)
+        elif self.state is ParseState.EXPERIENCE:
+            if line[0] in '•-*' and not line.startswith('**'):
+                # Bullet point belonging to the current company
+                point = line[1:].strip()
+                if self.company is not None and point:
+                    self.company.bulletPoints.append(point)
+            elif not indented or self.company is None:
+                # Any other unindented line (plain, **bold** or a # heading) starts a new company section
+                if self.company is not None:
+                    event = self._finish_company()
+                    if event:
+                        events.append(event)
+                self.company = WorkExperience(line.strip('#* '), [])
+        return events
+
+    def close(self):
+        """Finish the sections still open at the end of the response"""
+        events = []
+        if self.summary is None and self.summary_lines:
+            events.append(self._finish_summary())
+        if self.company is not None:
+            event = self._finish_company()
+            if event:
+                events.append(event)
+        return events
+
+    def result(self):
+        return TailoredContent(self.summary or '', self.companies)
+
+def parse_ai_response(ai_response):
+    """Parse the AI response to extract summary and work experience sections
+
+    JSON-mode output is decoded directly; anything else goes through the text-format parser.
+    Missing content (a refusal or filtered response) parses to empty content.
+    """
+    if not isinstance(ai_response, str):
+        ai_response = ''
+    try:
+        parsed = orjson.loads(ai_response)
+    except orjson.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, dict):
+        return clean_tailored_content(parsed.get('summary'), parsed.get('workExperience'))
     
-    # Remove any special characters from summary and bullet points
-    result['summary'] = re.sub(r'[*"]', '', result['summary'])
-    for exp in result['workExperience']:
-        exp['bulletPoints'] = [re.sub(r'[*"]', '', bp) for bp in exp['bulletPoints']]
+    parser = ResponseParser()
+    for line in ai_response.splitlines():
+        parser.feed(line)
+    parser.close()
+    return parser.result()
+
+def validate_tailored_content(tailored_content, finish_reason):
+    """Reject output that did not finish normally or parsed to nothing, instead of reporting it as a success"""
+    if finish_reason == 'length':
+        raise ValueError("AI response was cut off at the token limit")
+    if finish_reason != 'stop':
+        # content_filter, tool calls or a stream that ended without a finish reason
+        raise ValueError(f"AI response did not complete (finish reason: {finish_reason})")
+    if not tailored_content.summary and not tailored_content.workExperience:
+        raise ValueError("AI response did not contain a summary or work experience")
+    return tailored_content
+
+def add_cors_headers(response):
+    """Allow any origin to call the API"""
+    headers = response.headers
+    headers['Access-Control-Allow-Origin'] = '*'
+    headers['Access-Control-Allow-Headers'] = 'Content-Type, If-None-Match'
+    headers['Access-Control-Expose-Headers'] = 'ETag'
+    return response
+
+def create_app():
+    """Create the Flask app, failing fast when the OpenAI API key is not configured"""
+    if not openai_api_key:
+        raise RuntimeError(
+            "OPENAI_API_KEY not found in environment variables. "
+            "Add OPENAI_API_KEY=your_key_here to your .env file"
+        )
     
-    return result
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    # Enable CORS for all routes
+    app.after_request(add_cors_headers)
+    app.register_blueprint(api)
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"Starting server on port {port}...")
-    print(f"OpenAI API key configured: {bool(openai_api_key)}")
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    # Production runs under gunicorn with gevent workers, see gunicorn.conf.py
+    from gevent.pywsgi import WSGIServer
+    WSGIServer(('0.0.0.0', port), app).serve_forever()
\ No newline at end of file
@@ -0,0 +1,14 @@
+# gunicorn configuration, picked up automatically by `gunicorn app:app`
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# gevent workers yield while waiting on OpenAI, so each worker serves many requests concurrently.
+# All OpenAI I/O in app.py is synchronous (the bulk endpoint fans out over gevent greenlets);
+# do not add asyncio event loops or async views, they cannot share a thread between greenlets.
+worker_class = "gevent"
+# Workers must import app after gevent patches; patching after openai is imported fails, so
+# do not enable --preload.
+preload_app = False
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_connections = 100
@@ -0,0 +1,98 @@
+import os
+import re
+from dataclasses import asdict
+
+import pytest
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from app import parse_ai_response
+
+
+def legacy_parse_ai_response(ai_response):
+    """The original regex-based parser, kept as the reference for the text format"""
+    result = {
+        'summary': '',
+        'workExperience': []
+    }
+
+    summary_match = re.search(r'SUMMARY:(.*?)(?=EXPERIENCE:|$)', ai_response, re.DOTALL | re.IGNORECASE)
+    if summary_match:
+        summary_text = summary_match.group(1).strip()
+        summary_text = re.sub(r'^\s*•\s*', '', summary_text)
+        summary_text = re.sub(r'\s+', ' ', summary_text)
+        result['summary'] = summary_text
+
+    experience_section = re.search(r'EXPERIENCE:(.*?)$', ai_response, re.DOTALL | re.IGNORECASE)
+    if experience_section:
+        experience_text = experience_section.group(1).strip()
+        company_sections = re.split(r'\n(?=[^\s•\-*])', experience_text)
+
+        for section in company_sections:
+            if not section.strip():
+                continue
+
+            lines = section.strip().split('\n')
+            company_name = lines[0].strip()
+            bullet_points = []
+
+            for line in lines[1:]:
+                line = line.strip()
+                if line.startswith('•') or line.startswith('-') or line.startswith('*'):
+                    point = line[1:].strip()
+                    if point:
+                        bullet_points.append(point)
+
+            if company_name and bullet_points:
+                result['workExperience'].append({
+                    'company': company_name,
+                    'bulletPoints': bullet_points[:4]
+                })
+
+    result['summary'] = re.sub(r'[*"]', '', result['summary'])
+    for exp in result['workExperience']:
+        exp['bulletPoints'] = [re.sub(r'[*"]', '', bp) for bp in exp['bulletPoints']]
+
+    return result
+
+
+PLAIN_RESPONSES = [
+    "SUMMARY:\n• Backend engineer with 6 years of Python.\n\nEXPERIENCE:\nAcme Corp\n• Built the billing API\n• Cut p99 latency by 40%\n\nGlobex\n- Led a team of \"four\"\n* Migrated to Postgres\n",
+    "SUMMARY: Data engineer   focused on\nstreaming pipelines.\nEXPERIENCE:\nInitech\n• One\n• Two\n• Three\n• Four\n• Five\n",
+    "summary:\nLowercase headers still work.\nexperience:\nUmbrella\n   • Indented bullet\n   continuation that is ignored\n• Second bullet\nHooli\n",
+    "Here is the tailored content.\nSUMMARY:\nShort summary.\nEXPERIENCE:\nNo bullets here\nPied Piper\n•\n• Real bullet\n",
+    "No sections at all",
+    "",
+]
+
+
+@pytest.mark.parametrize('ai_response', PLAIN_RESPONSES)
+def test_matches_legacy_parser(ai_response):
+    assert asdict(parse_ai_response(ai_response)) == legacy_parse_ai_response(ai_response)
+
+
+def test_markdown_headers():
+    ai_response = (
+        "### SUMMARY:\nSeasoned engineer.\n\n"
+        "**WORK EXPERIENCE:**\n**Acme Corp**\n- Built the billing API\n"
+        "### Globex\n* Led the migration\n"
+    )
+    assert asdict(parse_ai_response(ai_response)) == {
+        'summary': 'Seasoned engineer.',
+        'workExperience': [
+            {'company': 'Acme Corp', 'bulletPoints': ['Built the billing API']},
+            {'company': 'Globex', 'bulletPoints': ['Led the migration']},
+        ]
+    }
+
+
+def test_header_text_on_same_line():
+    ai_response = "**PROFESSIONAL SUMMARY:** Seasoned engineer.\nEXPERIENCE:\nAcme Corp\n• Built the billing API\n"
+    assert parse_ai_response(ai_response).summary == 'Seasoned engineer.'
+
+
+def test_indented_line_does_not_start_company():
+    ai_response = "SUMMARY:\nSummary.\nEXPERIENCE:\nAcme Corp\n• Built the billing API\n  which processes payments\n• Cut latency\n"
+    assert asdict(parse_ai_response(ai_response))['workExperience'] == [
+        {'company': 'Acme Corp', 'bulletPoints': ['Built the billing API', 'Cut latency']}
+    ]